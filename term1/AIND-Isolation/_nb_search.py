@@ -0,0 +1,203 @@
+"""This file contains a Numba-compiled negamax search with alpha-beta pruning
+for Isolation boards of up to 64 cells, which is used by `CustomPlayer` in
+place of the pure Python search when Numba is installed.
+
+The board is packed into a uint64 occupancy mask (as in `bitboard`) plus the
+cell index of each player, and the kernel evaluates leaves with the same
+heuristic as `game_agent.custom_score`.
+
+Importing this module raises ImportError when Numba is not available.
+"""
+import numpy as np
+
+import bitboard
+
+from numba import njit
+from numba import types
+
+
+# move tables, built on first use for each board size
+_TABLES = {}
+
+_SCORE_MOVE = types.Tuple((types.float64, types.int64))
+
+
+def tables(width, height):
+    """Return the precomputed move tables for a board size as a tuple
+    (moves, bits), where `moves[i]` lists the cells an L-shaped move can
+    reach from cell `i` (padded with -1) and `bits[i]` is the occupancy mask
+    of cell `i`.
+    """
+    table = _TABLES.get((width, height))
+    if table is None:
+        moves = np.full((width * height, 8), -1, dtype=np.int64)
+        for r in range(height):
+            for c in range(width):
+                dests = [(r + dr) * width + c + dc for dr, dc in bitboard.KNIGHT_DELTAS
+                         if 0 <= r + dr < height and 0 <= c + dc < width]
+                moves[r * width + c, :len(dests)] = dests
+        bits = np.array([1 << i for i in range(width * height)], dtype=np.uint64)
+        table = (moves, bits)
+        _TABLES[(width, height)] = table
+    return table
+
+
+def pack_masks(occ, me, opp):
+    """Pack the Python int occupancy and location masks of a state (see
+    `bitboard`), given the locations of the player to move and of the other
+    player, into a tuple (occupancy, active, inactive) of the uint64
+    occupancy mask and the cell indices of the two players.
+    """
+    return np.uint64(occ), me.bit_length() - 1, opp.bit_length() - 1
+
+
+@njit(types.int64(types.uint64, types.int64, types.int64[:, :], types.uint64[:]),
+      cache=True)
+def mobility(occ, pos, moves, bits):
+    """Count the open cells an L-shaped move can reach from `pos`."""
+    n = 0
+    for k in range(8):
+        sq = moves[pos, k]
+        if sq < 0:
+            break
+        if occ & bits[sq] == 0:
+            n += 1
+    return n
+
+
+@njit(_SCORE_MOVE(types.uint64, types.int64, types.int64, types.int64,
+                  types.int64, types.float64, types.float64,
+                  types.int64[:, :], types.uint64[:], types.int64[:]),
+      cache=True)
+def search_root(occ, me, opp, depth, first, alpha, beta, moves, bits, counter):
+    """Negamax search with alpha-beta pruning in the window (alpha, beta)
+    from the point of view of the player to move (standing on cell `me`),
+    trying the move to cell `first` (e.g., the best move of the previous
+    iteration) before the others.
+
+    The search runs on an explicit stack of per-ply frames instead of
+    recursing, so that no call is made per node. `counter` holds [nodes
+    visited, node limit, aborted flag]; once the limit is exceeded the flag
+    is set and the search returns a meaningless result, which the caller
+    must discard.
+
+    Returns the (score, move) pair of the root, where `move` is the cell
+    index of the best move or -1 if every move loses.
+    """
+    # frame of every ply: the state, the search window, the best score and
+    # move so far, the index of the next move in the move table and the
+    # move being searched below it
+    s_occ = np.empty(depth, dtype=np.uint64)
+    s_me = np.empty(depth, dtype=np.int64)
+    s_opp = np.empty(depth, dtype=np.int64)
+    s_alpha = np.empty(depth, dtype=np.float64)
+    s_beta = np.empty(depth, dtype=np.float64)
+    s_best = np.empty(depth, dtype=np.float64)
+    s_move = np.empty(depth, dtype=np.int64)
+    s_next = np.empty(depth, dtype=np.int64)
+    s_child = np.empty(depth, dtype=np.int64)
+
+    counter[0] += 1
+    ply = 0
+    s_occ[0], s_me[0], s_opp[0] = occ, me, opp
+    s_alpha[0], s_beta[0] = alpha, beta
+    s_best[0], s_move[0] = -np.inf, -1
+    s_next[0] = -1  # -1 stands for the `first` move at the root
+
+    while True:
+        # find the next open move of the frame on top of the stack
+        sq = -1
+        k = s_next[ply]
+        while k < 8:
+            if k < 0:
+                cand = first
+            else:
+                cand = moves[s_me[ply], k]
+                if cand < 0:
+                    k = 8
+                    break
+                if ply == 0 and cand == first:
+                    cand = -1
+            k += 1
+            if cand >= 0 and s_occ[ply] & bits[cand] == 0:
+                sq = cand
+                break
+        s_next[ply] = k
+
+        if sq < 0:
+            # all moves searched (or pruned): pass the score to the parent
+            if ply == 0:
+                return s_best[0], s_move[0]
+            score = -s_best[ply]
+            ply -= 1
+            sq = s_child[ply]
+        else:
+            counter[0] += 1
+            if counter[0] > counter[1]:
+                counter[2] = 1
+                return 0., -1
+            child_occ = s_occ[ply] | bits[sq]
+            if ply + 1 < depth:
+                s_child[ply] = sq
+                ply += 1
+                s_occ[ply], s_me[ply], s_opp[ply] = child_occ, s_opp[ply - 1], sq
+                s_alpha[ply], s_beta[ply] = -s_beta[ply - 1], -s_alpha[ply - 1]
+                s_best[ply], s_move[ply] = -np.inf, -1
+                s_next[ply] = 0
+                continue
+            # leaf: custom_score of the child for the opponent, negated
+            opp_moves = mobility(child_occ, s_opp[ply], moves, bits)
+            if opp_moves == 0:
+                score = np.inf
+            else:
+                score = float(mobility(child_occ, sq, moves, bits) - opp_moves)
+
+        if score > s_best[ply]:
+            s_best[ply] = score
+            s_move[ply] = sq
+        if score > s_alpha[ply]:
+            s_alpha[ply] = score
+        if s_beta[ply] <= s_alpha[ply]:
+            s_next[ply] = 8
+
+
+def search(packed, depth, first, table, node_limit, alpha=-np.inf, beta=np.inf):
+    """Search a packed board (see `pack_masks`) to a fixed depth.
+
+    Parameters
+    ----------
+    packed : (uint64, int, int)
+        The packed board to search
+
+    depth : int
+        A strictly positive number of plies to search
+
+    first : int
+        The cell index of the move to search first; -1 for none
+
+    table : (ndarray, ndarray)
+        The move tables of the board size (see `tables`)
+
+    node_limit : int
+        The maximum number of nodes to visit before aborting the search
+
+    alpha : float (optional)
+        Lower bound of the search window
+
+    beta : float (optional)
+        Upper bound of the search window
+
+    Returns
+    -------
+    (float, int, int) or None
+        The score and the cell index of the best move (-1 if every move
+        loses) with the number of nodes visited, or None if the search was
+        aborted at the node limit.
+    """
+    counter = np.array([0, node_limit, 0], dtype=np.int64)
+    occ, me, opp = packed
+    score, move = search_root(occ, me, opp, depth, first, alpha, beta,
+                              table[0], table[1], counter)
+    if counter[2]:
+        return None
+    return float(score), int(move), int(counter[0])
@@ -14,6 +14,7 @@ import sys
 
 import isolation
 import game_agent
+import bitboard
 
 from collections import Counter
 from copy import deepcopy
@@ -129,6 +130,24 @@ def makeEvalTable(table):
     return score
 
 
+def random_board(min_moves, max_moves, width=7, height=7,
+                 player_1="Player1", player_2="Player2"):
+    """Create a board and play between `min_moves` and `max_moves` random
+    moves on it, stopping early if the player to move runs out of moves.
+
+    Returns the board and the list of the moves played.
+    """
+    board = isolation.Board(player_1, player_2, width, height)
+    moves = []
+    for _ in range(random.randint(min_moves, max_moves)):
+        legal_moves = board.get_legal_moves()
+        if not legal_moves:
+            break
+        moves.append(random.choice(legal_moves))
+        board.apply_move(moves[-1])
+    return board, moves
+
+
 def makeEvalStop(limit, timer, value=None):
     """Use a closure to create a heuristic function that forces the search
     timer to expire when a fixed number of node expansions have been perfomred
@@ -535,6 +554,135 @@ class Project1Test(unittest.TestCase):
             self.assertTrue(chosen_move in legal_moves, INVALID_MOVE.format(
                 legal_moves, chosen_move))
 
+    @timeout(30)
+    def test_alphabeta_iterative(self):
+        """ Test the enhanced alpha-beta search of iterative agents against
+        minimax, sharing the transposition table across depths as in
+        iterative deepening.
+        """
+        for _ in range(15):
+            agentUT = game_agent.CustomPlayer(iterative=True, method='alphabeta')
+            reference = game_agent.CustomPlayer(iterative=False, method='minimax')
+            agentUT.time_left = reference.time_left = lambda: 1e9
+            board, _ = random_board(2, 12, player_1=agentUT, player_2='null_agent')
+            snapshot = lambda: (deepcopy(board.__board_state__),
+                                copy(board.__last_player_move__),
+                                board.move_count, board.active_player)
+            state = snapshot()
+
+            for depth in range(1, 5):
+                score, move = agentUT.alphabeta(board, depth)
+                self.assertEqual(score, reference.minimax(board, depth)[0])
+                self.assertEqual(snapshot(), state)
+                if move != (-1, -1):
+                    self.assertIn(move, board.get_legal_moves())
+                    child = board.forecast_move(move)
+                    self.assertEqual(reference.minimax(child, depth - 1, False)[0], score)
+
+
+class BitboardTest(unittest.TestCase):
+
+    @timeout(5)
+    def test_legal_moves(self):
+        """ Test bitboard move generation against isolation.Board """
+        for w, h in [(7, 7), (9, 5), (11, 11)]:
+            table = bitboard.move_masks(w, h)
+            for _ in range(20):
+                board, _ = random_board(2, 20, w, h)
+                occ, p1, p2, _ = bitboard.pack_board(board)
+                for player, location in [("Player1", p1), ("Player2", p2)]:
+                    moves = bitboard.legal_moves(occ, location, table)
+                    unpacked = set()
+                    while moves:
+                        move = moves & -moves
+                        moves ^= move
+                        unpacked.add(bitboard.unpack_move(move, w))
+                    self.assertEqual(unpacked, set(board.get_legal_moves(player)))
+
+    @timeout(5)
+    def test_get_move_placement(self):
+        """ Test that placements are not searched on bitboards """
+        for w, h in [(5, 5), (8, 8)]:
+            agentUT = game_agent.CustomPlayer(method='alphabeta')
+            board = isolation.Board('null_agent', agentUT, w, h)
+            board.apply_move((0, 0))
+            self.assertFalse(agentUT._use_bitboard(board))
+            legal_moves = board.get_legal_moves()
+            start = curr_time_millis()
+            move = agentUT.get_move(board, legal_moves,
+                                    lambda: 100 - (curr_time_millis() - start))
+            self.assertIn(move, legal_moves)
+
+            board.apply_move(move)
+            board.apply_move(board.get_legal_moves()[0])
+            self.assertTrue(agentUT._use_bitboard(board))
+
+    @timeout(30)
+    def test_custom_score_parity(self):
+        """ Test the bitboard searches against minimax with custom_score """
+        for _ in range(8):
+            board, _ = random_board(8, 16)
+            if not board.get_legal_moves():
+                continue
+
+            agentUT = game_agent.CustomPlayer(score_fn=game_agent.custom_score)
+            agentUT.time_left = lambda: 1e9
+            occ, p1, p2, turn = bitboard.pack_board(board)
+            me, opp = (p1, p2) if turn == 0 else (p2, p1)
+            table = game_agent._nb_search and game_agent._nb_search.tables(7, 7)
+            for depth in range(1, 6):
+                score = agentUT.minimax(board, depth)[0]
+                searcher = bitboard.Searcher(7, 7, lambda: None)
+                self.assertEqual(searcher.search(occ, me, opp, depth)[0], score)
+                if game_agent._nb_search is not None:
+                    packed = game_agent._nb_search.pack_masks(occ, me, opp)
+                    result = game_agent._nb_search.search(packed, depth, -1, table, 10**9)
+                    self.assertEqual(result[0], score)
+
+    @timeout(30)
+    def test_parallel_search(self):
+        """ Test the parallel root search against the serial search """
+        game_agent._start_pool(2)
+        try:
+            for _ in range(10):
+                board, _ = random_board(4, 12)
+                if not board.get_legal_moves():
+                    continue
+
+                agentUT = game_agent.CustomPlayer(method='alphabeta')
+                agentUT.time_left = lambda: 1e9
+                occ, p1, p2, turn = bitboard.pack_board(board)
+                me, opp = (p1, p2) if turn == 0 else (p2, p1)
+                searcher = bitboard.Searcher(7, 7, lambda: None)
+                for depth in (5, 6):
+                    score, _ = searcher.search(occ, me, opp, depth)
+                    result = agentUT._parallel_search(board, occ, me, opp, depth, 0, 500.)
+                    self.assertEqual(result[0], score)
+                    if result[1]:
+                        move = result[1]
+                        self.assertEqual(-searcher.search(occ | move, opp, move, depth - 1)[0],
+                                         score)
+        finally:
+            game_agent._stop_pool()
+
+
+class SymmetryTest(unittest.TestCase):
+
+    @timeout(5)
+    def test_canonical_key(self):
+        """ Test that symmetric boards share their canonical key """
+        for w, h in [(7, 7), (9, 5)]:
+            syms = game_agent._symmetries(w, h)
+            self.assertEqual(len(syms), 8 if w == h else 4)
+            for _ in range(10):
+                board, moves = random_board(1, 6, w, h)
+                key = game_agent.canonical_key(board)[0]
+                for perm, _ in syms:
+                    image = isolation.Board("Player1", "Player2", w, h)
+                    for move in moves:
+                        image.apply_move(game_agent._map_move(move, perm, w))
+                    self.assertEqual(game_agent.canonical_key(image)[0], key)
+
 
 if __name__ == '__main__':
     unittest.main()
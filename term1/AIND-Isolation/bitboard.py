@@ -0,0 +1,148 @@
+"""This file contains a bitboard representation of Isolation game states and
+a negamax search over it, which `CustomPlayer` uses in place of
+`isolation.Board` to search with the `custom_score` heuristic.
+
+A state is packed into Python integers used as sets with one bit per cell
+(bit r * width + c for cell (r, c)): an occupancy mask of the blocked cells
+and a one-bit location mask for each player. Successor states are computed
+with a couple of bitwise operations instead of copying a `Board`, and the
+legal moves of a player with a lookup in a per-cell table of move masks.
+"""
+
+# infinite scores, bound once instead of calling float() at every node
+_NEG_INF = float("-inf")
+_POS_INF = float("inf")
+
+KNIGHT_DELTAS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                 (1, -2),  (1, 2), (2, -1),  (2, 1)]
+
+# move tables, built on first use for each board size
+_MOVES = {}
+
+
+def move_masks(width, height):
+    """Return the move table of a board size: the list of the masks of the
+    cells an L-shaped move can reach from every cell, indexed by cell.
+    """
+    table = _MOVES.get((width, height))
+    if table is None:
+        table = []
+        for r in range(height):
+            for c in range(width):
+                mask = 0
+                for dr, dc in KNIGHT_DELTAS:
+                    if 0 <= r + dr < height and 0 <= c + dc < width:
+                        mask |= 1 << ((r + dr) * width + c + dc)
+                table.append(mask)
+        _MOVES[(width, height)] = table
+    return table
+
+
+def pack_board(game):
+    """Pack an `isolation.Board` into a tuple (occ, p1, p2, turn) of the
+    occupancy mask, the location masks of player 1 and player 2 (0 if not
+    placed yet) and the index of the player to move (0 or 1).
+    """
+    occ = 0
+    bit = 1
+    for row in game.__board_state__:
+        for value in row:
+            if value:
+                occ |= bit
+            bit <<= 1
+    locations = []
+    for player in (game.__player_1__, game.__player_2__):
+        loc = game.get_player_location(player)
+        locations.append(0 if loc is None else 1 << (loc[0] * game.width + loc[1]))
+    turn = 0 if game.active_player == game.__player_1__ else 1
+    return occ, locations[0], locations[1], turn
+
+
+def unpack_move(move, width):
+    """Convert a one-bit location mask to a (row, column) pair."""
+    return divmod(move.bit_length() - 1, width)
+
+
+def legal_moves(occ, pos, table):
+    """Return the mask of open cells an L-shaped move can reach from the
+    one-bit location mask `pos`, given the move table of the board size.
+    """
+    return table[pos.bit_length() - 1] & ~occ
+
+
+def popcount(mask):
+    """Count the bits set in a mask."""
+    return bin(mask).count("1")
+
+
+class Searcher:
+    """Negamax search with alpha-beta pruning over packed states, scoring
+    leaves with the `custom_score` heuristic. The best move found for every
+    interior state is kept across searches and tried first when the state is
+    searched again (e.g., by the next iteration of iterative deepening).
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board
+
+    height : int
+        The number of rows of the board
+
+    check_time : callable
+        A function called every `CHECK_INTERVAL` nodes, which must raise an
+        exception to abort the search when time is up.
+    """
+    CHECK_INTERVAL = 256
+
+    def __init__(self, width, height, check_time):
+        self.table = move_masks(width, height)
+        self.check_time = check_time
+        self.best_moves = {}
+        self.nodes = 0
+
+    def search(self, occ, me, opp, depth, alpha=_NEG_INF, beta=_POS_INF):
+        """Search a state to a fixed depth from the point of view of the
+        player to move, standing on `me`.
+
+        Returns
+        -------
+        float
+            The score of the state for the player to move
+
+        int
+            The location mask of the best move; 0 if every move loses
+        """
+        self.nodes += 1
+        if not self.nodes % self.CHECK_INTERVAL:
+            self.check_time()
+
+        table = self.table
+        moves = table[me.bit_length() - 1] & ~occ
+        if depth == 0:
+            if not moves:
+                return _NEG_INF, 0
+            return float(popcount(moves) - popcount(table[opp.bit_length() - 1] & ~occ)), 0
+        if not moves:
+            return _NEG_INF, 0
+
+        key = (occ, me, opp)
+        first = self.best_moves.get(key, 0) & moves
+        best_score = _NEG_INF
+        best_move = 0
+        while moves:
+            if first:
+                move, first = first, 0
+            else:
+                move = moves & -moves
+            moves &= ~move
+            score = -self.search(occ | move, opp, move, depth - 1, -beta, -alpha)[0]
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        self.best_moves[key] = best_move
+        return best_score, best_move
@@ -6,7 +6,78 @@ augment the test suite with your own test cases to further test your code.
 You must test your agent's strength against a set of agents with known
 relative strength using tournament.py and include the results in your report.
 """
+import atexit
+import gc
+import multiprocessing
+import os
 import random
+import time
+
+import bitboard
+
+try:
+    import _nb_search
+except ImportError:
+    # Numba is not installed: search in pure Python
+    _nb_search = None
+else:
+    # importing Numba and NumPy leaves ~100k objects tracked by the garbage
+    # collector, enough for a full collection to pause the search for longer
+    # than the timer threshold; move them out of the collected generations
+    # (gc.freeze is only available from Python 3.7)
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+
+
+# infinite scores, bound once instead of calling float() at every node
+_NEG_INF = float("-inf")
+_POS_INF = float("inf")
+
+#: Transposition table entry flags: the stored value is exact, a lower bound
+#: (the search failed high) or an upper bound (the search failed low).
+EXACT, LOWER, UPPER = 0, 1, 2
+
+#: Width of the null window used by principal variation search to test
+#: whether a move is better than the current best one.
+PVS_WINDOW = 1e-6
+
+#: Half width of the aspiration window centered on the score of the previous
+#: iteration of iterative deepening alpha-beta search.
+ASPIRATION_WINDOW = 1.
+
+#: Number of plies iterative deepening alpha-beta search may add below a leaf
+#: where the player to move has at most one legal move.
+QUIESCENCE_PLIES = 2
+
+#: Alpha-beta search polls `time_left` only when the node counter has none of
+#: these bits set, i.e. every 32 nodes. The interval is kept small because a
+#: node of the Board-based search costs tens of microseconds.
+TIME_CHECK_MASK = 31
+
+#: Fraction of the estimated node rate of the compiled search used to set the
+#: node limit of its next iteration, as a margin for rate fluctuations.
+JIT_RATE_MARGIN = 0.5
+
+#: The transposition table keys of states with fewer moves played than this
+#: are shared by all the states symmetric to them (see `canonical_key`).
+SYMMETRY_MOVES = 4
+
+#: Iterative deepening searches on bitboards search the root moves in
+#: parallel from this depth on, when the machine has several CPUs.
+PARALLEL_DEPTH = 5
+
+# Zobrist key tables, built on first use for each board size
+_ZOBRIST = {}
+
+# move tables, built on first use for each board size
+_MOVES = {}
+
+# board symmetries, built on first use for each board size
+_SYMMETRIES = {}
+
+# worker processes of the parallel root search, started by the first agent
+# that can use them (see `_start_pool`)
+_POOL = None
 
 
 class Timeout(Exception):
@@ -14,6 +85,55 @@ class Timeout(Exception):
     pass
 
 
+def _move_table(width, height):
+    """Return the move table of a board size, where `table[r][c]` lists the
+    cells an L-shaped move can reach from cell (r, c), in the order
+    `isolation.Board` generates them.
+    """
+    table = _MOVES.get((width, height))
+    if table is None:
+        table = [[[(r + dr, c + dc) for dr, dc in bitboard.KNIGHT_DELTAS
+                   if 0 <= r + dr < height and 0 <= c + dc < width]
+                  for c in range(width)] for r in range(height)]
+        _MOVES[(width, height)] = table
+    return table
+
+
+def get_legal_moves_fast(game, player=None):
+    """Return the same list as `game.get_legal_moves(player)`, filtering the
+    precomputed moves of the player location instead of generating and
+    bounds-checking every L-shaped move.
+    """
+    if player is None:
+        player = game.active_player
+    loc = game.get_player_location(player)
+    if loc is None:
+        return game.get_blank_spaces()
+    state = game.__board_state__
+    return [move for move in _move_table(game.width, game.height)[loc[0]][loc[1]]
+            if not state[move[0]][move[1]]]
+
+
+def make_move(game, move):
+    """Apply a move to `game` in place, as `game.apply_move` does, and return
+    the previous location of the player to move, which `unmake_move` needs
+    to take the move back.
+    """
+    undo = game.__last_player_move__[game.active_player]
+    game.apply_move(move)
+    return undo
+
+
+def unmake_move(game, move, undo):
+    """Take back `move`, the last move applied to `game` by `make_move`,
+    given the value `make_move` returned.
+    """
+    game.__board_state__[move[0]][move[1]] = game.BLANK
+    game.__active_player__, game.__inactive_player__ = game.__inactive_player__, game.__active_player__
+    game.__last_player_move__[game.__active_player__] = undo
+    game.move_count -= 1
+
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -21,6 +141,12 @@ def custom_score(game, player):
     Note: this function should be called from within a Player instance as
     `self.score()` -- you should not need to call this function directly.
 
+    Note: the bitboard searches `CustomPlayer` runs with this heuristic
+    (`bitboard.Searcher.search` and `_nb_search.search_root`) reimplement it
+    at their leaves; any change made here must be made there as well, or the
+    agent will keep playing with the old heuristic. `agent_test.py` checks
+    that they agree with a minimax search using this function.
+
     Parameters
     ----------
     game : `isolation.Board`
@@ -36,15 +162,227 @@ def custom_score(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    if game.is_loser(player):
-        return float("-inf")
-    if game.is_winner(player):
-        return float("inf")
+    numberOfMyMoves = len(get_legal_moves_fast(game, player))
+    numberOfOpponentMoves = len(get_legal_moves_fast(game, game.get_opponent(player)))
+    # the game is over when the player to move has no legal moves; checked
+    # on the counts above rather than with is_loser/is_winner, which would
+    # generate the moves again
+    if player == game.active_player:
+        if not numberOfMyMoves:
+            return _NEG_INF
+    elif not numberOfOpponentMoves:
+        return _POS_INF
     # # of my moves - # of my opponent moves
-    numberOfMyMoves = game.get_legal_moves(player)
-    numberOfOpponentMoves = game.get_legal_moves(game.get_opponent(player))
-#    return float(len(numberOfOpponentMoves))
-    return float(len(numberOfMyMoves)-len(numberOfOpponentMoves))
+    return float(numberOfMyMoves-numberOfOpponentMoves)
+
+
+def _zobrist_table(width, height):
+    """Return the random keys used to hash boards of the given size as a
+    tuple (cells, locations, side, minimizing, blank), where `cells[i][s]` is
+    the key for cell `i` in state `s` (blank, blocked by player 1, blocked by
+    player 2), `locations[p][i]` is the key for player `p` standing on cell
+    `i` and `blank` is the combined key of all the cells blank.
+    """
+    table = _ZOBRIST.get((width, height))
+    if table is None:
+        rand = random.getrandbits
+        size = width * height
+        cells = [[rand(64) for _ in range(3)] for _ in range(size)]
+        blank = 0
+        for cell in cells:
+            blank ^= cell[0]
+        table = (cells, [[rand(64) for _ in range(size)] for _ in range(2)],
+                 rand(64), rand(64), blank)
+        _ZOBRIST[(width, height)] = table
+    return table
+
+
+def zobrist_key(game, maximizing_player=True):
+    """Compute the Zobrist hash of a game state.
+
+    Parameters
+    ----------
+    game : `isolation.Board`
+        An instance of `isolation.Board` encoding the current state of the
+        game (e.g., player locations and blocked cells).
+
+    maximizing_player : bool
+        Flag indicating whether the state is searched on a maximizing layer;
+        it is part of the key because search values are stored from the point
+        of view of the root player.
+
+    Returns
+    -------
+    int
+        A 64-bit key identifying the state.
+    """
+    cells, locations, side, minimizing, _ = _zobrist_table(game.width, game.height)
+    key = 0
+    idx = 0
+    for row in game.__board_state__:
+        for value in row:
+            key ^= cells[idx][value]
+            idx += 1
+    for p, player in enumerate((game.__player_1__, game.__player_2__)):
+        loc = game.get_player_location(player)
+        if loc is not None:
+            key ^= locations[p][loc[0] * game.width + loc[1]]
+    if game.active_player == game.__player_1__:
+        key ^= side
+    if not maximizing_player:
+        key ^= minimizing
+    return key
+
+
+def _symmetries(width, height):
+    """Return the symmetries of a board size (the 4 rotations and their
+    reflections for square boards, the 2 reflections and the half turn
+    otherwise) as a list of (perm, inverse) pairs, where `perm[i]` is the
+    image of cell `i` and `inverse` is the inverse permutation. The first
+    symmetry is the identity.
+    """
+    syms = _SYMMETRIES.get((width, height))
+    if syms is None:
+        w, h = width - 1, height - 1
+        maps = [lambda r, c: (r, c), lambda r, c: (h - r, c),
+                lambda r, c: (r, w - c), lambda r, c: (h - r, w - c)]
+        if width == height:
+            maps += [lambda r, c: (c, r), lambda r, c: (w - c, r),
+                     lambda r, c: (c, h - r), lambda r, c: (w - c, h - r)]
+        syms = []
+        for f in maps:
+            perm = [0] * (width * height)
+            inverse = [0] * (width * height)
+            for r in range(height):
+                for c in range(width):
+                    fr, fc = f(r, c)
+                    perm[r * width + c] = fr * width + fc
+                    inverse[fr * width + fc] = r * width + c
+            syms.append((perm, inverse))
+        _SYMMETRIES[(width, height)] = syms
+    return syms
+
+
+def _map_move(move, perm, width):
+    """Return the image of a move by a permutation of the cells."""
+    if move == (-1, -1):
+        return move
+    return divmod(perm[move[0] * width + move[1]], width)
+
+
+def canonical_key(game, maximizing_player=True):
+    """Compute the smallest Zobrist hash (see `zobrist_key`) of the images of
+    a game state by the symmetries of the board, which is the same for all
+    the states symmetric to each other.
+
+    Returns
+    -------
+    int
+        A 64-bit key identifying the state up to symmetry
+
+    (list<int>, list<int>)
+        The symmetry mapping the state to the image hashed, as a pair of a
+        permutation of the cells and its inverse (see `_symmetries`)
+    """
+    width = game.width
+    cells, locations, side, minimizing, base = _zobrist_table(width, game.height)
+    syms = _symmetries(width, game.height)
+
+    # the key of the empty board is the same for every symmetry, so only
+    # the blocked cells need to be mapped
+    blocked = []
+    idx = 0
+    for row in game.__board_state__:
+        for value in row:
+            if value:
+                blocked.append((idx, value))
+            idx += 1
+    if game.active_player == game.__player_1__:
+        base ^= side
+    if not maximizing_player:
+        base ^= minimizing
+    players = []
+    for p, player in enumerate((game.__player_1__, game.__player_2__)):
+        loc = game.get_player_location(player)
+        if loc is not None:
+            players.append((p, loc[0] * width + loc[1]))
+
+    best_key, best_sym = None, None
+    for sym in syms:
+        perm = sym[0]
+        key = base
+        for idx, value in blocked:
+            cell = cells[perm[idx]]
+            key ^= cell[0] ^ cell[value]
+        for p, idx in players:
+            key ^= locations[p][perm[idx]]
+        if best_key is None or key < best_key:
+            best_key, best_sym = key, sym
+    return best_key, best_sym
+
+
+def _start_pool(processes=None):
+    """Start the worker processes of the parallel root search, one per CPU
+    unless `processes` is given, if they are not running yet and there are
+    at least two of them.
+    """
+    global _POOL
+    processes = processes or os.cpu_count() or 1
+    if _POOL is None and processes > 1:
+        _POOL = multiprocessing.Pool(processes)
+        # stop the workers before the interpreter tears down the modules the
+        # pool needs to shut them down
+        atexit.register(_POOL.terminate)
+
+
+def _stop_pool():
+    """Stop the worker processes of the parallel root search, if running."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.terminate()
+        _POOL.join()
+        _POOL = None
+
+
+def _search_child(task):
+    """Search the state reached by a root move on bitboards, in a worker
+    process of the parallel root search (or in the agent process).
+
+    Parameters
+    ----------
+    task : tuple
+        The tuple (move, width, height, occ, me, opp, depth, alpha, beta,
+        deadline, nodes_per_ms) of the location mask of the root move, the
+        board size, the packed state reached by the move (see `bitboard`),
+        the depth and window of the search, the `time.time()` by which the
+        search must return and the node rate used to set its node limit in
+        the compiled kernel of `_nb_search`.
+
+    Returns
+    -------
+    (int, float)
+        The root move and the score of the state for the player to move, or
+        None in place of the score if the search ran out of time
+    """
+    move, width, height, occ, me, opp, depth, alpha, beta, deadline, nodes_per_ms = task
+    if _nb_search is not None and width * height <= 64:
+        node_limit = int(JIT_RATE_MARGIN * nodes_per_ms * 1000. * (deadline - time.time()))
+        if node_limit <= 0:
+            return move, None
+        result = _nb_search.search(_nb_search.pack_masks(occ, me, opp), depth, -1,
+                                   _nb_search.tables(width, height), node_limit,
+                                   alpha, beta)
+        return move, None if result is None else result[0]
+
+    def check_time():
+        if time.time() > deadline:
+            raise Timeout()
+
+    try:
+        return move, bitboard.Searcher(width, height, check_time).search(
+            occ, me, opp, depth, alpha, beta)[0]
+    except Timeout:
+        return move, None
 
 
 class CustomPlayer:
@@ -75,8 +413,60 @@ class CustomPlayer:
         Time remaining (in milliseconds) when search is aborted. Should be a
         positive value large enough to allow the function to return before the
         timer expires.
+
+    Notes
+    -----
+        Iterative deepening alpha-beta search keeps a transposition table of
+        the states searched during the current move, so that later iterations
+        can reuse the results and best moves of earlier ones, and orders the
+        moves of each interior node by their shallow score, after the best move
+        of the transposition table and the killer moves of the ply (the last
+        two moves that caused a cutoff at the same distance from the root), and
+        searches all but the first move with a null window (principal variation
+        search). It applies and takes back moves on the board being searched
+        (`make_move`, `unmake_move`) instead of copying it with
+        `forecast_move`. In the opening, symmetric states share their
+        transposition table entry (see `canonical_key`). Leaves where the
+        player to move has at most one legal move are searched up to
+        `QUIESCENCE_PLIES` deeper. Fixed-depth search is left as the plain
+        textbook algorithm.
+
+        Iterative deepening alpha-beta agents with the `custom_score`
+        heuristic play their first placement on 7x7 boards from an opening
+        book, which was computed with that search and heuristic.
+
+        Iterative deepening alpha-beta search with the `custom_score`
+        heuristic searches packed bitboards (see `bitboard`) instead of
+        `isolation.Board` objects, in the compiled kernel of `_nb_search` when
+        Numba is installed (for boards of up to 64 cells). On machines with
+        several CPUs, the root moves of its iterations from `PARALLEL_DEPTH`
+        on are searched in parallel by worker processes.
     """
 
+    # Opening book for 7x7 boards mapping (move_count, opponent location) to
+    # the move to play: the first placement, then the reply to every first
+    # placement of the opponent. Precomputed offline by a depth 14 alpha-beta
+    # search of every pair of placements with the custom_score heuristic.
+    _OPENING = {
+        (0, None): (4, 3), (1, (0, 0)): (2, 3), (1, (0, 1)): (3, 3),
+        (1, (0, 2)): (2, 3), (1, (0, 3)): (3, 3), (1, (0, 4)): (2, 3),
+        (1, (0, 5)): (3, 3), (1, (0, 6)): (2, 3), (1, (1, 0)): (3, 3),
+        (1, (1, 1)): (2, 3), (1, (1, 2)): (3, 3), (1, (1, 3)): (2, 3),
+        (1, (1, 4)): (3, 3), (1, (1, 5)): (2, 3), (1, (1, 6)): (3, 3),
+        (1, (2, 0)): (2, 3), (1, (2, 1)): (3, 3), (1, (2, 2)): (0, 1),
+        (1, (2, 3)): (3, 3), (1, (2, 4)): (0, 5), (1, (2, 5)): (3, 3),
+        (1, (2, 6)): (2, 3), (1, (3, 0)): (3, 3), (1, (3, 1)): (2, 3),
+        (1, (3, 2)): (3, 3), (1, (3, 3)): (2, 3), (1, (3, 4)): (3, 3),
+        (1, (3, 5)): (2, 3), (1, (3, 6)): (3, 3), (1, (4, 0)): (2, 3),
+        (1, (4, 1)): (3, 3), (1, (4, 2)): (5, 0), (1, (4, 3)): (3, 3),
+        (1, (4, 4)): (5, 6), (1, (4, 5)): (3, 3), (1, (4, 6)): (2, 3),
+        (1, (5, 0)): (3, 3), (1, (5, 1)): (2, 3), (1, (5, 2)): (3, 3),
+        (1, (5, 3)): (2, 3), (1, (5, 4)): (3, 3), (1, (5, 5)): (2, 3),
+        (1, (5, 6)): (3, 3), (1, (6, 0)): (2, 3), (1, (6, 1)): (3, 3),
+        (1, (6, 2)): (2, 3), (1, (6, 3)): (3, 3), (1, (6, 4)): (2, 3),
+        (1, (6, 5)): (3, 3), (1, (6, 6)): (2, 3)
+    }
+
     def __init__(self, search_depth=3, score_fn=custom_score,
                  iterative=True, method='minimax', timeout=10.):
         self.search_depth = search_depth
@@ -85,6 +475,12 @@ class CustomPlayer:
         self.method = method
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.tt = {}
+        self.killers = []
+        self._root_player = None
+        self._node_counter = 0
+        if score_fn is custom_score and iterative and method == 'alphabeta':
+            _start_pool()
 
     def get_move(self, game, legal_moves, time_left):
         """Search for the best move from the available legal moves and return a
@@ -123,6 +519,9 @@ class CustomPlayer:
         """
 
         self.time_left = time_left
+        self.tt.clear()
+        self.killers = [[None, None] for _ in range(game.width * game.height)]
+        self._node_counter = 0
 
         # TODO: finish this function!
 
@@ -134,6 +533,17 @@ class CustomPlayer:
         if not legal_moves:
             return (-1,-1)
 
+        if self.score is custom_score and self.iterative and self.method == 'alphabeta' and \
+                game.move_count < 2 and game.width == game.height == 7:
+            location = game.get_player_location(game.inactive_player)
+            booked_move = self._OPENING.get((game.move_count, location))
+            if booked_move in legal_moves:
+                return booked_move
+
+        if self._use_bitboard(game):
+            if _nb_search is not None and game.width * game.height <= 64:
+                return self._jit_get_move(game, legal_moves)
+            return self._bitboard_get_move(game, legal_moves)
 
         next_move = legal_moves[0]
 
@@ -142,18 +552,42 @@ class CustomPlayer:
             # here in order to avoid timeout. The try/except block will
             # automatically catc]h the exception raised by the search method
             # when the timer gets close to expiring
-            iteration_candidate = list(range(1,game.move_count + game.width * game.height - 1)) if self.iterative else [self.search_depth]
+            iteration_candidate = range(1,game.move_count + game.width * game.height - 1) if self.iterative else (self.search_depth,)
 
+            # quiescence extension: leaves where the player to move is
+            # (almost) out of moves are searched a little deeper
+            extension_budget = QUIESCENCE_PLIES if self.iterative else 0
+            prev_score = None
             for depth in iteration_candidate:
-                score,move = self.alphabeta(game,depth) if self.method == 'alphabeta' else self.minimax(game,depth)
+                if self.method != 'alphabeta':
+                    score,move = self.minimax(game,depth)
+                elif prev_score is None or abs(prev_score) == _POS_INF:
+                    score,move = self.alphabeta(game,depth,root_moves=legal_moves,
+                                                extension_budget=extension_budget)
+                else:
+                    # aspiration window around the previous iteration score;
+                    # re-search with the window opened on the failing side
+                    alpha = prev_score - ASPIRATION_WINDOW
+                    beta = prev_score + ASPIRATION_WINDOW
+                    score,move = self.alphabeta(game,depth,alpha,beta,root_moves=legal_moves,
+                                                extension_budget=extension_budget)
+                    if score <= alpha:
+                        score,move = self.alphabeta(game,depth,_NEG_INF,score + ASPIRATION_WINDOW,
+                                                    root_moves=legal_moves,
+                                                    extension_budget=extension_budget)
+                    elif score >= beta:
+                        score,move = self.alphabeta(game,depth,score - ASPIRATION_WINDOW,_POS_INF,
+                                                    root_moves=legal_moves,
+                                                    extension_budget=extension_budget)
+                prev_score = score
+
+                if score != _NEG_INF:
+                    next_move = move
 
-                if score == float("+inf"):
+                if score == _POS_INF:
                     # find the best path.break and return
                     break
 
-                if score != float("-inf"):
-                    next_move = move
-
         except Timeout:
             # Handle any actions required at timeout, if necessary
             pass
@@ -161,6 +595,138 @@ class CustomPlayer:
         # Return the best move from the last completed search iteration
         return next_move
 
+    def _use_bitboard(self, game):
+        """Test whether the current move can be searched on packed bitboards
+        (see `bitboard`) rather than on `isolation.Board` objects, which
+        requires the `custom_score` heuristic the bitboard searches implement
+        and both players placed on the board (the player to move is placed
+        only if the other one is, as player 1 places first).
+        """
+        return self.score is custom_score and self.iterative and \
+               self.method == 'alphabeta' and \
+               game.get_player_location(game.active_player) is not None
+
+    def _check_time(self):
+        """Raise Timeout when the search must return."""
+        if self.time_left() < self.TIMER_THRESHOLD:
+            raise Timeout()
+
+    def _bitboard_get_move(self, game, legal_moves):
+        """Perform iterative deepening alpha-beta search on packed bitboards
+        with `bitboard.Searcher`.
+        """
+        occ, p1, p2, turn = bitboard.pack_board(game)
+        me, opp = (p1, p2) if turn == 0 else (p2, p1)
+        searcher = bitboard.Searcher(game.width, game.height, self._check_time)
+        next_move = legal_moves[0]
+        move = 0
+
+        try:
+            for depth in range(1, len(game.get_blank_spaces()) + 1):
+                if _POOL is not None and depth >= PARALLEL_DEPTH:
+                    result = self._parallel_search(game, occ, me, opp, depth, move)
+                    if result is None:
+                        break
+                    score, move = result
+                else:
+                    score, move = searcher.search(occ, me, opp, depth)
+                if move:
+                    next_move = bitboard.unpack_move(move, game.width)
+                if score == _POS_INF or score == _NEG_INF:
+                    # the game is decided within the search horizon
+                    break
+        except Timeout:
+            pass
+
+        return next_move
+
+    def _jit_get_move(self, game, legal_moves):
+        """Perform iterative deepening alpha-beta search with the compiled
+        kernel of `_nb_search`.
+
+        The kernel cannot poll `self.time_left`, so every iteration gets a node
+        limit for the time remaining before the timer threshold, estimated from
+        the node rate of the previous iterations. An iteration that reaches its
+        limit is discarded just like one interrupted by a timeout.
+        """
+        table = _nb_search.tables(game.width, game.height)
+        occ, p1, p2, turn = bitboard.pack_board(game)
+        me, opp = (p1, p2) if turn == 0 else (p2, p1)
+        packed = _nb_search.pack_masks(occ, me, opp)
+        next_move = legal_moves[0]
+        best = -1
+        nodes_per_ms = 10.
+
+        for depth in range(1, len(game.get_blank_spaces()) + 1):
+            start = self.time_left()
+            budget = start - self.TIMER_THRESHOLD
+            if budget <= 0:
+                break
+            if _POOL is not None and depth >= PARALLEL_DEPTH:
+                # the node rate stays the one of the last serial iteration
+                result = self._parallel_search(game, occ, me, opp, depth,
+                                               0 if best < 0 else 1 << best, nodes_per_ms)
+                if result is None:
+                    break
+                score, move = result
+                best = move.bit_length() - 1
+            else:
+                node_limit = int(JIT_RATE_MARGIN * nodes_per_ms * budget)
+                result = _nb_search.search(packed, depth, best, table, node_limit)
+                if result is None:
+                    break
+                score, best, nodes = result
+                elapsed = start - self.time_left()
+                if elapsed > 0:
+                    nodes_per_ms = nodes / elapsed
+
+            if best >= 0:
+                next_move = divmod(best, game.width)
+            if score == _POS_INF or score == _NEG_INF:
+                # the game is decided within the search horizon
+                break
+
+        return next_move
+
+    def _parallel_search(self, game, occ, me, opp, depth, first, nodes_per_ms=0.):
+        """Search a packed state (see `bitboard`) to a fixed depth with the
+        Young Brothers Wait Concept: the first move (e.g., the best move of the
+        previous iteration) is searched in this process to set alpha, then the
+        other root moves are searched with that alpha by the worker processes.
+
+        Returns
+        -------
+        (float, int) or None
+            The score of the state and the location mask of its best move (0
+            if every move loses), or None if a search ran out of time
+        """
+        moves = bitboard.legal_moves(occ, me, bitboard.move_masks(game.width, game.height))
+        if not first & moves:
+            first = moves & -moves
+        deadline = time.time() + (self.time_left() - self.TIMER_THRESHOLD) / 1000.
+
+        def task(move, alpha):
+            return (move, game.width, game.height, occ | move, opp, move, depth - 1,
+                    _NEG_INF, -alpha, deadline, nodes_per_ms)
+
+        score = _search_child(task(first, _NEG_INF))[1]
+        if score is None:
+            return None
+        best_score, best_move = -score, first
+        moves &= ~first
+        if moves and best_score < _POS_INF:
+            tasks = []
+            while moves:
+                move = moves & -moves
+                moves ^= move
+                tasks.append(task(move, best_score))
+            for move, score in _POOL.imap_unordered(_search_child, tasks):
+                if score is None:
+                    return None
+                if -score > best_score:
+                    best_score, best_move = -score, move
+        return best_score, best_move if best_score > _NEG_INF else 0
+
     def minimax(self, game, depth, maximizing_player=True):
         """Implement the minimax search algorithm as described in the lectures.
 
@@ -192,38 +758,13 @@ class CustomPlayer:
                 to pass the project unit tests; you cannot call any other
                 evaluation function directly.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise Timeout()
-
-        if depth != 0:
-            legal_moves = game.get_legal_moves()
-            highest_score = float("-inf")
-            next_move = (-1,-1)
-
-            if maximizing_player is False:
-                # min part: set highest_score to +inf and keep reduce it.
-                highest_score = float("+inf")
-
-            for move in legal_moves:
-                #recursively call minmax algo
-                potentialScore = self.minimax(game.forecast_move(move),depth-1,not maximizing_player)[0]
-                if maximizing_player:
-                    #max part: max
-                    if potentialScore > highest_score:
-                        highest_score = potentialScore
-                        next_move = move
-                else:
-                    #min part: min
-                    if potentialScore < highest_score:
-                        highest_score = potentialScore
-                        next_move = move
+        color = 1 if maximizing_player else -1
+        self._root_player = game.active_player if maximizing_player else game.inactive_player
+        score, move = self._negamax(game, depth, _NEG_INF, _POS_INF, color, prune=False)
+        return (color * score, move)
 
-            return (highest_score,next_move)
-        else:
-            # if depth is 0, we hit the base case for this recusive function. So we just call score function
-            return (self.score(game,game.active_player if maximizing_player else game.inactive_player), (-1,-1))
-
-    def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf"), maximizing_player=True):
+    def alphabeta(self, game, depth, alpha=_NEG_INF, beta=_POS_INF, maximizing_player=True,
+                  root_moves=None, extension_budget=0):
         """Implement minimax search with alpha-beta pruning as described in the
         lectures.
 
@@ -247,6 +788,14 @@ class CustomPlayer:
             Flag indicating whether the current search depth corresponds to a
             maximizing layer (True) or a minimizing layer (False)
 
+        root_moves : list<(int, int)> (optional)
+            The legal moves of `game` when already known (e.g., those passed
+            to get_move), to avoid generating them again
+
+        extension_budget : int (optional)
+            The number of extra plies an iterative deepening search may spend
+            on leaves where the player to move has at most one legal move
+
         Returns
         -------
         float
@@ -261,41 +810,198 @@ class CustomPlayer:
                 to pass the project unit tests; you cannot call any other
                 evaluation function directly.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise Timeout()
+        color = 1 if maximizing_player else -1
+        self._root_player = game.active_player if maximizing_player else game.inactive_player
+        if not maximizing_player:
+            alpha, beta = -beta, -alpha
+        if len(self.killers) < game.width * game.height:
+            # searched outside of get_move
+            self.killers = [[None, None] for _ in range(game.width * game.height)]
+        score, move = self._negamax(game, depth, alpha, beta, color,
+                                    extension=extension_budget, moves=root_moves)
+        return (color * score, move)
+
+    def _negamax(self, game, depth, alpha, beta, color, prune=True, extension=0, moves=None,
+                 ply=0):
+        """Search the game tree in negamax form, where the value of a node is
+        the score of the root player (`self._root_player`) multiplied by
+        `color` (+1 on maximizing layers, -1 on minimizing layers), so that
+        every layer maximizes the negated values of its children.
 
-        if depth != 0:
-            legal_moves = game.get_legal_moves()
-            highest_score = float("-inf")
-            next_move = (-1,-1)
-
-            if maximizing_player is False:
-                # min part: set highest_score to +inf and keep reduce it.
-                highest_score = float("+inf")
-
-            for move in legal_moves:
-                #recursively call alphabeta algo
-                potentialScore = self.alphabeta(game.forecast_move(move),depth-1,alpha,beta,not maximizing_player)[0]
-                if maximizing_player:
-                    #max part: max
-                    if potentialScore > highest_score:
-                        highest_score = potentialScore
-                        next_move = move
-                    #update alpha for max
-                    alpha = max(alpha,highest_score)
+        Parameters
+        ----------
+        game : isolation.Board
+            An instance of the Isolation game `Board` class representing the
+            current game state
+
+        depth : int
+            Depth is an integer representing the maximum number of plies to
+            search in the game tree before aborting
+
+        alpha : float
+            Lower bound of the search window for the player to move
 
+        beta : float
+            Upper bound of the search window for the player to move
+
+        color : {1, -1}
+            The sign of the root player score for the player to move
+
+        prune : bool (optional)
+            Flag indicating whether to perform alpha-beta pruning (True) or
+            plain minimax search (False)
+
+        extension : int (optional)
+            The number of extra plies left to extend leaves where the player
+            to move has at most one legal move
+
+        moves : list<(int, int)> (optional)
+            The legal moves of `game` if already known; the list is not
+            modified
+
+        ply : int (optional)
+            The number of plies between the root of the search and `game`
+
+        Returns
+        -------
+        float
+            The score for the current search branch, for the player to move
+
+        tuple(int, int)
+            The best move for the current branch; (-1, -1) for no legal moves
+        """
+        # alpha-beta polls the timer once every TIME_CHECK_MASK + 1 nodes;
+        # minimax polls it at every node, as the unit tests expect
+        if prune:
+            self._node_counter += 1
+            if not self._node_counter & TIME_CHECK_MASK and self.time_left() < self.TIMER_THRESHOLD:
+                raise Timeout()
+        elif self.time_left() < self.TIMER_THRESHOLD:
+            raise Timeout()
+
+        if depth == 0:
+            if extension and prune and self.iterative and len(get_legal_moves_fast(game)) <= 1:
+                # quiescence: do not trust the score of a position one ply
+                # away from a forced move or a loss; search one more ply
+                return self._negamax(game, 1, alpha, beta, color, prune, extension - 1,
+                                     ply=ply)
+            # base case for this recursive function: just call score function
+            return (color * self.score(game, self._root_player), (-1,-1))
+
+        legal_moves = get_legal_moves_fast(game) if moves is None else list(moves)
+        highest_score = _NEG_INF
+        next_move = (-1,-1)
+
+        # transposition table probe: cut off or narrow the window with a
+        # result stored by an earlier search of the same state
+        enhanced = prune and self.iterative
+        score, root_player = self.score, self._root_player
+        key = None
+        tt_move = None
+        sym = None
+        if enhanced:
+            if game.move_count < SYMMETRY_MOVES:
+                # opening: share the entry with the symmetric states, which
+                # stores its move for the image of the state hashed
+                key, sym = canonical_key(game, color > 0)
+            else:
+                key = zobrist_key(game, color > 0)
+            entry = self.tt.get(key)
+            if entry is not None:
+                entry_depth, value, flag, tt_move = entry
+                if sym is not None:
+                    tt_move = _map_move(tt_move, sym[1], game.width)
+                if entry_depth >= depth:
+                    if flag == EXACT:
+                        return (value, tt_move)
+                    if flag == LOWER:
+                        alpha = max(alpha, value)
+                    else:
+                        beta = min(beta, value)
+                    if alpha >= beta:
+                        return (value, tt_move)
+
+            # move ordering: presort the children by their shallow score
+            # (best first for the side to move); not worth it right above
+            # the leaves
+            if depth > 1:
+                shallow_scores = {}
+                for move in legal_moves:
+                    undo = make_move(game, move)
+                    shallow_scores[move] = score(game, root_player)
+                    unmake_move(game, move, undo)
+                legal_moves.sort(key=shallow_scores.get, reverse=color > 0)
+
+            # killer moves: the last moves that caused a cutoff at this ply
+            # in a sibling subtree, searched right after the TT move
+            killers = self.killers[ply]
+            for killer in reversed(killers):
+                if killer in legal_moves:
+                    legal_moves.remove(killer)
+                    legal_moves.insert(0, killer)
+
+            # search the best move of the earlier search first
+            if tt_move in legal_moves:
+                legal_moves.remove(tt_move)
+                legal_moves.insert(0, tt_move)
+        alpha_orig, beta_orig = alpha, beta
+
+        for i, move in enumerate(legal_moves):
+            if enhanced:
+                # make/unmake: search the successor on `game` itself
+                # rather than on a copy, and restore `game` afterwards
+                # (also when the search times out)
+                child = game
+                undo = make_move(game, move)
+            else:
+                child = game.forecast_move(move)
+            try:
+                if depth == 1 and not (extension and enhanced and len(get_legal_moves_fast(child)) <= 1):
+                    # leaf parent: score the successor in place rather than
+                    # recursing into a depth 0 call just to score it
+                    if prune:
+                        self._node_counter += 1
+                        if not self._node_counter & TIME_CHECK_MASK and self.time_left() < self.TIMER_THRESHOLD:
+                            raise Timeout()
+                    elif self.time_left() < self.TIMER_THRESHOLD:
+                        raise Timeout()
+                    potentialScore = color * score(child, root_player)
+                elif enhanced and i:
+                    # principal variation search: prove with a null window that
+                    # the move is no better than alpha, and re-search it with
+                    # the full window only if that fails high
+                    potentialScore = -self._negamax(child, depth-1, -alpha-PVS_WINDOW, -alpha, -color,
+                                                    extension=extension, ply=ply+1)[0]
+                    if alpha < potentialScore < beta:
+                        potentialScore = -self._negamax(child, depth-1, -beta, -potentialScore, -color,
+                                                        extension=extension, ply=ply+1)[0]
                 else:
-                    #min part: min
-                    if potentialScore < highest_score:
-                        highest_score = potentialScore
-                        next_move = move
-                    #update beta for min
-                    beta = min(beta,highest_score)
-                
+                    #recursively call negamax algo
+                    potentialScore = -self._negamax(child, depth-1, -beta, -alpha, -color, prune, extension,
+                                                    ply=ply+1)[0]
+            finally:
+                if enhanced:
+                    unmake_move(game, move, undo)
+
+            if potentialScore > highest_score:
+                highest_score = potentialScore
+                next_move = move
+
+            if prune:
+                alpha = max(alpha, highest_score)
                 #alpha-beta pruning if no better value can be found
                 if beta <= alpha:
+                    if enhanced and move != killers[0]:
+                        self.killers[ply] = [move, killers[0]]
                     break
-            return (highest_score,next_move)
-        else:
-            # if depth is 0, we hit the base case for this recusive function. So we just call score function
-            return (self.score(game,game.active_player if maximizing_player else game.inactive_player), (-1,-1))
+
+        if key is not None:
+            if highest_score <= alpha_orig:
+                flag = UPPER
+            elif highest_score >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self.tt[key] = (depth, highest_score, flag,
+                            next_move if sym is None else _map_move(next_move, sym[0], game.width))
+        return (highest_score,next_move)